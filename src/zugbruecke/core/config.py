@@ -74,6 +74,15 @@ def get_default_config():
 	# Default config directory
 	cfg['dir'] = __get_default_config_directory__()
 
+	# RPC transport for calls from Unix to Wine: 'socket' or 'shm' (shared memory)
+	cfg['transport'] = 'socket'
+
+	# Size of each of the two shared memory ring buffers in bytes (power of two)
+	cfg['shm_size'] = 1048576
+
+	# Number of iterations a reader spins on shared memory before blocking
+	cfg['shm_spin'] = 2000
+
 	return cfg
 
 
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/data/wire.py: Compact binary call messages for simple routines
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2018 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pickle
+import struct
+
+from ..const import (
+	GROUP_VOID,
+	GROUP_FUNDAMENTAL
+	)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONSTANTS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Bump if the layout of call or return blocks changes
+WIRE_VERSION = 1
+
+# Status byte at the beginning of every return block
+WIRE_STATUS_SUCCESS = 0
+WIRE_STATUS_ERROR = 1
+
+# Exceptions are pickled - both sides must be able to read it
+WIRE_PICKLE_PROTOCOL = 4
+
+# Fundamental types with fixed layout, sizes as seen by the DLL (Windows, 32 bit)
+WIRE_TYPE_CODES = {
+	'c_bool': '?',
+	'c_byte': 'b',
+	'c_ubyte': 'B',
+	'c_short': 'h',
+	'c_ushort': 'H',
+	'c_int': 'i',
+	'c_uint': 'I',
+	'c_long': 'l',
+	'c_ulong': 'L',
+	'c_longlong': 'q',
+	'c_ulonglong': 'Q',
+	'c_float': 'f',
+	'c_double': 'd',
+	'c_longdouble': 'd' # same as double on Windows
+	}
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def generate_wire_format(argtypes_d, restype_d, memsync_d):
+	"""
+	Returns a wire format for routines, which only take and return fundamental
+	scalars (by value) and do not sync memory. Returns None for everything else.
+	"""
+
+	# Memory sync requires the generic path
+	if len(memsync_d) > 0:
+		return None
+
+	# Collect struct codes of arguments
+	arg_codes = []
+	for arg_d in argtypes_d:
+		code = get_wire_type_code(arg_d)
+		if code is None:
+			return None
+		arg_codes.append(code)
+
+	# Void return value
+	if restype_d['g'] == GROUP_VOID and restype_d['t'] is None and len(restype_d['f']) == 0:
+		return_code = ''
+	else:
+		return_code = get_wire_type_code(restype_d)
+		if return_code is None:
+			return None
+
+	return wire_format_class(arg_codes, return_code)
+
+
+def get_wire_type_code(datatype_d):
+
+	if datatype_d['g'] != GROUP_FUNDAMENTAL or len(datatype_d['f']) != 0:
+		return None
+
+	return WIRE_TYPE_CODES.get(datatype_d['t'], None)
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: WIRE FORMAT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class wire_format_class():
+
+
+	def __init__(self, arg_codes, return_code):
+
+		# Number of expected arguments
+		self.arg_count = len(arg_codes)
+
+		# Call block: version (u8), arguments
+		self.call_struct = struct.Struct('<B' + ''.join(arg_codes))
+
+		# Return block: version (u8), status (u8), return value
+		self.return_struct = struct.Struct('<BB' + return_code)
+		self.has_return_value = return_code != ''
+
+		# Header of error blocks
+		self.error_struct = struct.Struct('<BB')
+
+
+	def pack_call(self, args):
+		"""
+		Returns None if the arguments do not fit - caller must use the generic path then
+		"""
+
+		if len(args) != self.arg_count:
+			return None
+
+		# Strip ctypes objects down to their values
+		try:
+			return self.call_struct.pack(WIRE_VERSION, *[
+				arg.value if hasattr(arg, 'value') else arg for arg in args
+				])
+		except struct.error:
+			return None
+
+
+	def unpack_call(self, message):
+
+		values = self.call_struct.unpack_from(message)
+
+		if values[0] != WIRE_VERSION:
+			raise ValueError('wire format version mismatch: got %d, expected %d' % (values[0], WIRE_VERSION))
+
+		return values[1:]
+
+
+	def pack_return(self, return_value):
+
+		if self.has_return_value:
+			return self.return_struct.pack(WIRE_VERSION, WIRE_STATUS_SUCCESS, return_value)
+		return self.return_struct.pack(WIRE_VERSION, WIRE_STATUS_SUCCESS)
+
+
+	def pack_error(self, exception):
+
+		return (
+			self.error_struct.pack(WIRE_VERSION, WIRE_STATUS_ERROR) +
+			pickle.dumps(exception, protocol = WIRE_PICKLE_PROTOCOL)
+			)
+
+
+	def unpack_return(self, message):
+
+		version, status = self.error_struct.unpack_from(message)
+
+		if version != WIRE_VERSION:
+			raise ValueError('wire format version mismatch: got %d, expected %d' % (version, WIRE_VERSION))
+
+		# Raise the original error if call was not a success
+		if status == WIRE_STATUS_ERROR:
+			raise pickle.loads(message[self.error_struct.size:])
+
+		if self.has_return_value:
+			return self.return_struct.unpack_from(message)[2]
+		return None
@@ -41,7 +41,7 @@ from .routine_client import routine_client_class
 class dll_client_class(): # Representing one idividual dll to be called into, returned by LoadLibrary
 
 
-	def __init__(self, parent_session, dll_name, dll_type, hash_id):
+	def __init__(self, parent_session, dll_name, dll_type, hash_id, method_ids):
 
 		# Store dll parameters name, path and type
 		self.name = dll_name
@@ -63,10 +63,10 @@ class dll_client_class(): # Representing one idividual dll to be called into, re
 		self.routines = {}
 
 		# Expose routine registration
-		self.__register_routine_on_server__ = getattr(self.rpc_client, self.hash_id + '_register_routine')
+		self.__register_routine_on_server__ = self.rpc_client.get_handle(method_ids['register_routine'])
 
 		# Expose string reprentation of dll object
-		self.__get_repr__ = getattr(self.rpc_client, self.hash_id + '_repr')
+		self.__get_repr__ = self.rpc_client.get_handle(method_ids['repr'])
 
 
 	def __attach_to_routine__(self, name):
@@ -86,8 +86,8 @@ class dll_client_class(): # Representing one idividual dll to be called into, re
 
 		try:
 
-			# Register routine in wine
-			self.__register_routine_on_server__(name)
+			# Register routine in wine, get method ids of routine
+			method_ids = self.__register_routine_on_server__(name)
 
 		except AttributeError as e:
 
@@ -97,7 +97,7 @@ class dll_client_class(): # Representing one idividual dll to be called into, re
 			raise e
 
 		# Create new instance of routine_client
-		self.routines[name] = routine_client_class(self, name)
+		self.routines[name] = routine_client_class(self, name, method_ids)
 
 		# Log status
 		self.log.out('[dll-client] ... registered (unconfigured) ...')
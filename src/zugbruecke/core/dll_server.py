@@ -65,15 +65,17 @@ class dll_server_class(): # Representing one idividual dll to be called into
 		# Hash my own path as unique ID
 		self.hash_id = get_hash_of_string(self.name)
 
-		# Export registration of my functions directly
-		self.session.rpc_server.register_function(
-			self.__get_repr__,
-			self.hash_id + '_repr'
-			)
-		self.session.rpc_server.register_function(
-			self.__register_routine__,
-			self.hash_id + '_register_routine'
-			)
+		# Export registration of my functions directly, keep their method ids
+		self.method_ids = {
+			'repr': self.session.rpc_server.register_function(
+				self.__get_repr__,
+				self.hash_id + '_repr'
+				),
+			'register_routine': self.session.rpc_server.register_function(
+				self.__register_routine__,
+				self.hash_id + '_register_routine'
+				)
+			}
 
 
 	def __get_repr__(self):
@@ -83,12 +85,12 @@ class dll_server_class(): # Representing one idividual dll to be called into
 
 	def __register_routine__(self, routine_name):
 		"""
-		Exposed interface
+		Exposed interface, returns dict of method ids of routine
 		"""
 
 		# Just in case this routine is already known
 		if routine_name in self.routines.keys():
-			return True # Success
+			return self.routines[routine_name].method_ids
 
 		# Log status
 		self.log.out('[dll-server] Trying to access "%s" in DLL file "%s" ...' % (str(routine_name), self.name))
@@ -127,15 +129,24 @@ class dll_server_class(): # Representing one idividual dll to be called into
 		# Generate new instance of routine class
 		self.routines[routine_name] = routine_server_class(self, routine_name, routine_handler)
 
-		# Export call and configration directly
-		self.session.rpc_server.register_function(
-			self.routines[routine_name],
-			self.hash_id + '_' + str(routine_name) + '_handle_call'
-			)
-		self.session.rpc_server.register_function(
-			self.routines[routine_name].__configure__,
-			self.hash_id + '_' + str(routine_name) + '_configure'
-			)
+		# Export call and configration directly (names for introspection, ids for calls)
+		self.routines[routine_name].method_ids = {
+			'handle_call': self.session.rpc_server.register_function(
+				self.routines[routine_name],
+				self.hash_id + '_' + str(routine_name) + '_handle_call'
+				),
+			'handle_call_raw': self.session.rpc_server.register_function(
+				self.routines[routine_name].handle_call_raw,
+				self.hash_id + '_' + str(routine_name) + '_handle_call_raw'
+				),
+			'configure': self.session.rpc_server.register_function(
+				self.routines[routine_name].__configure__,
+				self.hash_id + '_' + str(routine_name) + '_configure'
+				)
+			}
 
 		# Log status
 		self.log.out('[dll-server] ... done.')
+
+		# Return method ids
+		return self.routines[routine_name].method_ids
@@ -35,6 +35,9 @@ import ctypes
 from functools import partial
 from pprint import pformat as pf
 
+from .data.wire import generate_wire_format
+from .rpc import chain_future
+
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # DLL CLIENT CLASS
@@ -43,7 +46,7 @@ from pprint import pformat as pf
 class routine_client_class():
 
 
-	def __init__(self, parent_dll, routine_name):
+	def __init__(self, parent_dll, routine_name, method_ids):
 
 		# Store handle on parent dll
 		self.dll = parent_dll
@@ -76,14 +79,24 @@ class routine_client_class():
 		self.__restype__ = ctypes.c_int
 
 		# Get handle on server-side configure
-		self.__configure_on_server__ = getattr(
-			self.rpc_client, self.dll.hash_id + '_' + str(self.name) + '_configure'
-			)
+		self.__configure_on_server__ = self.rpc_client.get_handle(method_ids['configure'])
 
 		# Get handle on server-side handle_call
-		self.__handle_call_on_server__ = getattr(
-			self.rpc_client, self.dll.hash_id + '_' + str(self.name) + '_handle_call'
+		self.__handle_call_on_server__ = self.rpc_client.get_handle(method_ids['handle_call'])
+
+		# Get handle on server-side handle_call for compact binary messages
+		self.__handle_call_raw_on_server__ = self.rpc_client.get_raw_handle(method_ids['handle_call_raw'])
+
+		# Same handles for asynchronous calls, returning futures
+		self.__handle_call_on_server_async__ = self.rpc_client.get_handle(
+			method_ids['handle_call'], is_async = True
 			)
+		self.__handle_call_raw_on_server_async__ = self.rpc_client.get_raw_handle(
+			method_ids['handle_call_raw'], is_async = True
+			)
+
+		# Compact binary messages, available after configuration for simple routines only
+		self.wire = None
 
 
 	def __call__(self, *args):
@@ -94,6 +107,82 @@ class routine_client_class():
 		# Log status
 		self.log.out('[routine-client] Trying to call routine "%s" in DLL file "%s" ...' % (self.name, self.dll.name))
 
+		# Make sure routine is configured
+		self.__prepare_call__()
+
+		# Simple routines take the compact binary path
+		message = self.__pack_call_raw__(args)
+		if message is not None:
+
+			# Raises the original error if call was not a success
+			return self.wire.unpack_return(self.__handle_call_raw_on_server__(message))
+
+		# Actually call routine in DLL! TODO Handle kw ...
+		return_dict = self.__handle_call_on_server__(*self.__pack_call__(args))
+
+		# Unpack arguments, return value and memory
+		return self.__unpack_return__(args, return_dict)
+
+
+	def call_async(self, *args):
+		"""
+		Returns a future. Arguments (and memory they point to) must not be touched
+		until the future is done.
+		"""
+
+		# Log status
+		self.log.out('[routine-client] Trying to call routine "%s" in DLL file "%s" asynchronously ...' % (self.name, self.dll.name))
+
+		# Make sure routine is configured
+		self.__prepare_call__()
+
+		# Simple routines take the compact binary path
+		message = self.__pack_call_raw__(args)
+		if message is not None:
+
+			# Raises the original error if call was not a success
+			return chain_future(
+				self.__handle_call_raw_on_server_async__(message),
+				self.wire.unpack_return
+				)
+
+		# Unpack arguments, return value and memory once answer arrives
+		return chain_future(
+			self.__handle_call_on_server_async__(*self.__pack_call__(args)),
+			partial(self.__unpack_return__, args)
+			)
+
+
+	def __pack_call__(self, args):
+
+		# Log status
+		self.log.out('[routine-client] ... parameters are "%r". Packing and pushing to server ...' % (args,))
+
+		# Handle memory
+		mem_package_list = self.data.client_pack_memory_list(args, self.memsync_d)
+
+		return self.data.arg_list_pack(args, self.argtypes_d), mem_package_list
+
+
+	def __pack_call_raw__(self, args):
+
+		# Wire format only exists for simple routines
+		if self.wire is None:
+			return None
+
+		# Returns None if arguments do not match the wire format
+		message = self.wire.pack_call(args)
+
+		if message is not None:
+
+			# Log status
+			self.log.out('[routine-client] ... parameters are "%r". Pushing raw to server ...' % (args,))
+
+		return message
+
+
+	def __prepare_call__(self):
+
 		# Has this routine ever been called?
 		if not self.called:
 
@@ -109,16 +198,8 @@ class routine_client_class():
 			# Log status
 			self.log.out('[routine-client] ... configured. Proceeding ...')
 
-		# Log status
-		self.log.out('[routine-client] ... parameters are "%r". Packing and pushing to server ...' % (args,))
-
-		# Handle memory
-		mem_package_list = self.data.client_pack_memory_list(args, self.memsync_d)
 
-		# Actually call routine in DLL! TODO Handle kw ...
-		return_dict = self.__handle_call_on_server__(
-			self.data.arg_list_pack(args, self.argtypes_d), mem_package_list
-			)
+	def __unpack_return__(self, args, return_dict):
 
 		# Log status
 		self.log.out('[routine-client] ... received feedback from server, unpacking & syncing arguments ...')
@@ -188,6 +269,9 @@ class routine_client_class():
 			self.argtypes_d, self.restype_d, memsync_d_packed
 			)
 
+		# Derive compact binary message layout (same on both sides, None if not applicable)
+		self.wire = generate_wire_format(self.argtypes_d, self.restype_d, self.memsync_d)
+
 
 	@property
 	def argtypes(self):
@@ -34,6 +34,8 @@ specific language governing rights and limitations under the License.
 from pprint import pformat as pf
 import traceback
 
+from .data.wire import generate_wire_format
+
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # DLL SERVER CLASS
@@ -62,6 +64,9 @@ class routine_server_class():
 		# Set routine handler
 		self.handler = routine_handler
 
+		# Compact binary messages, available after configuration for simple routines only
+		self.wire = None
+
 
 	def __call__(self, arg_message_list, arg_memory_list):
 		"""
@@ -145,6 +150,36 @@ class routine_server_class():
 			raise e
 
 
+	def handle_call_raw(self, message):
+
+		# Log status
+		self.log.out('[routine-server] Trying call routine "%s" (raw) ...' % self.name)
+
+		# Client must not use this path unless both sides agreed on a wire format
+		if self.wire is None:
+			raise TypeError('routine "%s" has no wire format' % self.name)
+
+		try:
+
+			# Call into dll
+			return_value = self.handler(*self.wire.unpack_call(message))
+
+		except Exception as e:
+
+			# Log status
+			self.log.out('[routine-server] ... call failed!')
+
+			# Push traceback to log
+			self.log.err(traceback.format_exc())
+
+			return self.wire.pack_error(e)
+
+		# Log status
+		self.log.out('[routine-server] ... done.')
+
+		return self.wire.pack_return(return_value)
+
+
 	def __configure__(self, argtypes_d, restype_d, memsync_d):
 
 		# Store argtype definition dict
@@ -156,6 +191,9 @@ class routine_server_class():
 		# Store memory sync instructions
 		self.memsync_d = self.data.unpack_definition_memsync(memsync_d)
 
+		# Derive compact binary message layout (same on both sides, None if not applicable)
+		self.wire = generate_wire_format(self.argtypes_d, self.restype_d, self.memsync_d)
+
 		try:
 
 			# Parse and apply argtype definition dict to actual ctypes routine
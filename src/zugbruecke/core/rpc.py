@@ -31,14 +31,97 @@ specific language governing rights and limitations under the License.
 # IMPORT
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+from concurrent.futures import (
+	Future,
+	ThreadPoolExecutor
+	)
 from multiprocessing.connection import (
 	Client,
 	Listener
 	)
-from threading import Thread
+import pickle
+import struct
+from threading import (
+	Lock,
+	Thread
+	)
 import time
 import traceback
 
+from .shm import shm_connection_class
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONSTANTS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Every message starts with a fixed header: protocol version (u8), message kind (u8), request id (u32)
+RPC_VERSION = 1
+RPC_HEADER = struct.Struct('<BBI')
+
+# Message kinds
+RPC_KIND_CALL = 0 # body: pickled (name or method id, args, kwargs)
+RPC_KIND_CALL_RAW = 1 # body: method id (u16), raw bytes
+RPC_KIND_RETURN = 2 # body: pickled return value
+RPC_KIND_RETURN_RAW = 3 # body: raw bytes
+RPC_KIND_ERROR = 4 # body: pickled exception
+RPC_KIND_ATTACH_SHM = 5 # body: pickled (shm path, ring size, spin), moves connection onto shared memory
+
+# Flag on call kinds: execute in background on server, answer may come out of order
+RPC_FLAG_ASYNC = 0x80
+
+RPC_METHOD_ID = struct.Struct('<H')
+
+# Request ids are unsigned 32 bit and wrap around
+RPC_REQUEST_ID_MASK = 0xFFFFFFFF
+
+# Both sides must be able to read it (Wine Python might be older than Unix Python)
+RPC_PICKLE_PROTOCOL = 4
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# MESSAGE ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def pack_message(kind, request_id, content):
+
+	# Raw bytes are sent as they are, everything else is pickled
+	if kind == RPC_KIND_RETURN_RAW:
+		body = content
+	else:
+		body = pickle.dumps(content, protocol = RPC_PICKLE_PROTOCOL)
+
+	return RPC_HEADER.pack(RPC_VERSION, kind, request_id) + body
+
+
+def unpack_message(message):
+
+	version, kind, request_id = RPC_HEADER.unpack_from(message)
+
+	# Do not guess, if the other side speaks a different version
+	if version != RPC_VERSION:
+		raise ValueError('RPC protocol version mismatch: got %d, expected %d' % (version, RPC_VERSION))
+
+	return kind, request_id, memoryview(message)[RPC_HEADER.size:]
+
+
+def chain_future(future, function):
+	"""
+	Returns a new future, which resolves to function(result of future)
+	"""
+
+	chained_future = Future()
+
+	def on_done(done_future):
+		try:
+			chained_future.set_result(function(done_future.result()))
+		except Exception as e:
+			chained_future.set_exception(e)
+
+	future.add_done_callback(on_done)
+
+	return chained_future
+
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 # CLASSES AND CONSTRUCTOR ROUTINES
@@ -73,7 +156,53 @@ def mp_client_safe_connect(socket_path, authkey, timeout_after_seconds = 30, wai
 	raise # TODO
 
 
+class mp_answer_class:
+	"""
+	Lightweight stand-in for a future, used by synchronous calls
+	"""
+
+
+	__slots__ = ('is_done', 'value', 'exception')
+
+
+	def __init__(self):
+
+		self.is_done = False
+		self.value = None
+		self.exception = None
+
+
+	def done(self):
+
+		return self.is_done
+
+
+	def result(self):
+
+		if self.exception is not None:
+			raise self.exception
+		return self.value
+
+
+	def set_exception(self, exception):
+
+		self.exception = exception
+		self.is_done = True
+
+
+	def set_result(self, value):
+
+		self.value = value
+		self.is_done = True
+
+
 class mp_client_class:
+	"""
+	Every request carries an id and is answered through a future. Whoever waits
+	for an answer reads from the connection and resolves futures on the way,
+	including those of other threads. A pump thread reads on behalf of
+	asynchronous calls while any of them is in flight.
+	"""
 
 
 	def __init__(self, socket_path, authkey):
@@ -81,35 +210,214 @@ class mp_client_class:
 		# Start new client on top of socket
 		self.client = Client(socket_path, authkey = authkey.encode('utf-8'))
 
+		# Only one thread sends at a time, only one thread receives at a time
+		self.__lock_send__ = Lock()
+		self.__lock_recv__ = Lock()
+		self.__lock_state__ = Lock()
+
+		# Futures of requests waiting for an answer, by request id
+		self.__pending__ = {}
+		self.__request_id__ = 0
+
+		# Number of asynchronous requests in flight and status of pump thread
+		self.__async_pending__ = 0
+		self.__pump_up__ = False
+
+
+	def attach_shm(self, shm_path_local, shm_path_remote, ring_size, spin):
+
+		# Map memory locally first - if this fails, nothing has changed
+		client_shm = shm_connection_class(self.client, shm_path_local, ring_size, spin, is_server = False)
+
+		# Ask server to map the memory and to switch over
+		try:
+			self.__wait__(self.__send_request__(RPC_KIND_ATTACH_SHM, pickle.dumps(
+				(shm_path_remote, ring_size, spin), protocol = RPC_PICKLE_PROTOCOL
+				)))
+		except Exception:
+			# Server could not map memory, stay on socket
+			client_shm.mm.close()
+			raise
+
+		# From now on, socket only serves as doorbell
+		with self.__lock_send__, self.__lock_recv__:
+			self.client = client_shm
+
+
+	def get_handle(self, method_id, is_async = False):
+
+		# Same as attribute access, but by integer id returned by register_function on server
+		return self.__get_handle__(method_id, is_async)
+
+
+	def get_raw_handle(self, method_id, is_async = False):
+
+		# Message prefix is identical for every call
+		kind = RPC_KIND_CALL_RAW | (RPC_FLAG_ASYNC if is_async else 0)
+		prefix = RPC_METHOD_ID.pack(method_id)
+
+		# Handler routine for raw calls: bytes in, bytes out
+		def do_raw_rpc(payload):
+
+			# Send request to server
+			future = self.__send_request__(kind, prefix + payload)
+			# Return future or wait for answer
+			return future if is_async else self.__wait__(future)
+
+		# Return pointer to handler routine
+		return do_raw_rpc
+
 
 	def __getattr__(self, name):
 
+		return self.__get_handle__(name, False)
+
+
+	def __get_handle__(self, name_or_id, is_async):
+
+		kind = RPC_KIND_CALL | (RPC_FLAG_ASYNC if is_async else 0)
+
 		# Handler routine in __getattr__ namespace
 		def do_rpc(*args, **kwargs):
 
 			# Send request to server
-			self.client.send((name, args, kwargs))
-			# Receive answer
-			result = self.client.recv()
-
-			# If the answer is an error, raise it
-			if isinstance(result, Exception):
-				raise result
-
-			# Return answer
-			return result
+			future = self.__send_request__(kind, pickle.dumps((name_or_id, args, kwargs), protocol = RPC_PICKLE_PROTOCOL))
+			# Return future or wait for answer
+			return future if is_async else self.__wait__(future)
 
 		# Return pointer to handler routine
 		return do_rpc
 
 
+	def __pump__(self):
+
+		while True:
+
+			# Exit if there is nothing left to wait for
+			with self.__lock_state__:
+				if self.__async_pending__ == 0:
+					self.__pump_up__ = False
+					return
+
+			with self.__lock_recv__:
+
+				# Answer might have been received by a waiting thread in the meantime
+				if self.__async_pending__ == 0:
+					continue
+
+				try:
+					self.__recv_answer__()
+				except (EOFError, OSError) as e:
+					self.__fail_pending__(e)
+
+
+	def __fail_pending__(self, exception):
+
+		# Connection is gone, no answer will ever arrive
+		with self.__lock_state__:
+			pending = list(self.__pending__.items())
+			self.__pending__.clear()
+			self.__async_pending__ = 0
+
+		for request_id, (future, is_async) in pending:
+			future.set_exception(exception)
+
+
+	def __recv_answer__(self):
+
+		# Receive answer (caller holds receive lock)
+		kind, request_id, body = unpack_message(self.client.recv_bytes())
+
+		# Find matching request (errors about broken requests might not have one)
+		with self.__lock_state__:
+			if request_id not in self.__pending__.keys():
+				return
+			future, is_async = self.__pending__.pop(request_id)
+			if is_async:
+				self.__async_pending__ -= 1
+
+		# Raw answer
+		if kind == RPC_KIND_RETURN_RAW:
+			future.set_result(body)
+			return
+
+		# Pickled answer
+		try:
+			result = pickle.loads(body)
+		except Exception as e:
+			future.set_exception(e)
+			return
+
+		# If the answer is an error, raise it
+		if kind == RPC_KIND_ERROR:
+			future.set_exception(result)
+		else:
+			future.set_result(result)
+
+
+	def __send_request__(self, kind, body):
+
+		is_async = bool(kind & RPC_FLAG_ASYNC)
+		future = Future() if is_async else mp_answer_class()
+
+		# Register request before sending it, answer might be fast
+		with self.__lock_state__:
+			self.__request_id__ = (self.__request_id__ + 1) & RPC_REQUEST_ID_MASK
+			request_id = self.__request_id__
+			self.__pending__[request_id] = (future, is_async)
+			if is_async:
+				self.__async_pending__ += 1
+				start_pump = not self.__pump_up__
+				self.__pump_up__ = True
+			else:
+				start_pump = False
+
+		# Send request to server
+		try:
+			with self.__lock_send__:
+				self.client.send_bytes(RPC_HEADER.pack(RPC_VERSION, kind, request_id) + body)
+		except Exception:
+			with self.__lock_state__:
+				self.__pending__.pop(request_id)
+				if is_async:
+					self.__async_pending__ -= 1
+			raise
+
+		# Asynchronous answers are received in the background
+		if start_pump:
+			t = Thread(target = self.__pump__)
+			t.daemon = True
+			t.start()
+
+		return future
+
+
+	def __wait__(self, future):
+
+		# Receive answers until the own one has arrived
+		while not future.done():
+			with self.__lock_recv__:
+				if future.done():
+					break
+				try:
+					self.__recv_answer__()
+				except (EOFError, OSError) as e:
+					self.__fail_pending__(e)
+
+		# Return answer or raise error
+		return future.result()
+
+
 class mp_server_handler_class:
 
 
 	def __init__(self):
 
-		# cache for registered functions
-		self.__functions__ = {}
+		# Registered functions, indexed by method id
+		self.__functions__ = []
+
+		# Method ids by public name, for lookup by name and introspection
+		self.__function_ids__ = {}
 
 		# Method for verifying server status
 		self.register_function(self.__get_handler_status__)
@@ -128,30 +436,131 @@ class mp_server_handler_class:
 		else:
 			function_name = function_pointer.__name__
 
-		# Register function in dict
-		self.__functions__[function_name] = function_pointer
+		# Replace function if name is already known, keep its id
+		if function_name in self.__function_ids__.keys():
+			method_id = self.__function_ids__[function_name]
+			self.__functions__[method_id] = function_pointer
+			return method_id
+
+		# Register function in list, its index becomes its id
+		method_id = len(self.__functions__)
+		self.__functions__.append(function_pointer)
+		self.__function_ids__[function_name] = method_id
+
+		# Return id - clients can call by id instead of name
+		return method_id
+
+
+	def get_function_name(self, method_id):
+
+		for function_name, function_id in self.__function_ids__.items():
+			if function_id == method_id:
+				return function_name
+
+		raise KeyError(method_id)
 
 
 	def handle_connection(self, connection_client):
 
+		# Answers of background calls may interleave with regular answers
+		lock_send = Lock()
+
+		def send_answer(kind, request_id, content):
+			try:
+				message = pack_message(kind, request_id, content)
+			except Exception as e: # e.g. result can not be pickled
+				message = pack_message(RPC_KIND_ERROR, request_id, e)
+			with lock_send:
+				connection_client.send_bytes(message)
+
+		# Background calls are executed in order of arrival, one at a time
+		executor = None
+
 		try:
 
 			while True:
 
 				# Receive the incomming message
-				function_name, args, kwargs = connection_client.recv()
+				message = connection_client.recv_bytes()
+				try:
+					kind, request_id, body = unpack_message(message)
+				except ValueError as e:
+					send_answer(RPC_KIND_ERROR, 0, e)
+					continue
+
+				# Client wants to move onto shared memory
+				if kind == RPC_KIND_ATTACH_SHM:
+					connection_client = self.__attach_shm__(connection_client, request_id, body)
+					continue
+
+				# Run the RPC in background and send a response when done
+				if kind & RPC_FLAG_ASYNC:
+					if executor is None:
+						executor = ThreadPoolExecutor(max_workers = 1)
+					executor.submit(self.__handle_request__, send_answer, kind & ~RPC_FLAG_ASYNC, request_id, body)
+					continue
 
 				# Run the RPC and send a response
-				try:
-					r = self.__functions__[function_name](*args,**kwargs)
-					connection_client.send(r)
-				except Exception as e:
-					connection_client.send(e)
+				self.__handle_request__(send_answer, kind, request_id, body)
 
-		except EOFError:
+		except (EOFError, OSError):
 
 			pass
 
+		finally:
+
+			if executor is not None:
+				executor.shutdown(wait = False)
+
+
+	def __attach_shm__(self, connection_client, request_id, body):
+
+		try:
+			shm_path, ring_size, spin = pickle.loads(body)
+			connection_shm = shm_connection_class(connection_client, shm_path, ring_size, spin, is_server = True)
+		except Exception as e:
+			connection_client.send_bytes(pack_message(RPC_KIND_ERROR, request_id, e))
+			return connection_client
+
+		# Confirm via socket, continue on shared memory
+		connection_client.send_bytes(pack_message(RPC_KIND_RETURN, request_id, True))
+		return connection_shm
+
+
+	def __get_function__(self, name_or_id):
+
+		# Usual case: method id
+		if isinstance(name_or_id, int):
+			return self.__functions__[name_or_id]
+
+		# Human readable name
+		return self.__functions__[self.__function_ids__[name_or_id]]
+
+
+	def __handle_request__(self, send_answer, kind, request_id, body):
+
+		try:
+
+			# Raw call: bytes in, bytes out
+			if kind == RPC_KIND_CALL_RAW:
+				method_id = RPC_METHOD_ID.unpack_from(body)[0]
+				r = self.__functions__[method_id](body[RPC_METHOD_ID.size:])
+				answer_kind = RPC_KIND_RETURN_RAW
+
+			# Pickled call
+			else:
+				function_name, args, kwargs = pickle.loads(body)
+				r = self.__get_function__(function_name)(*args,**kwargs)
+				answer_kind = RPC_KIND_RETURN
+
+		except Exception as e:
+
+			r = e
+			answer_kind = RPC_KIND_ERROR
+
+		# Send a response
+		send_answer(answer_kind, request_id, r)
+
 
 class mp_server_class():
 
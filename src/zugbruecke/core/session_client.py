@@ -55,6 +55,7 @@ from .rpc import (
 	mp_client_safe_connect,
 	mp_server_class
 	)
+from .shm import create_shm_file
 from .wineenv import (
 	create_wine_prefix,
 	setup_wine_python,
@@ -192,7 +193,7 @@ class session_client_class():
 		try:
 
 			# Tell wine about the dll and its type
-			hash_id = self.rpc_client.load_library(
+			hash_id, method_ids = self.rpc_client.load_library(
 				dll_name, dll_type, dll_param
 				)
 
@@ -206,7 +207,7 @@ class session_client_class():
 
 		# Fire up new dll object
 		self.dll_dict[dll_name] = dll_client_class(
-			self, dll_name, dll_type, hash_id
+			self, dll_name, dll_type, hash_id, method_ids
 			)
 
 		# Log status
@@ -370,6 +371,47 @@ class session_client_class():
 			'zugbruecke_wine'
 			)
 
+		# Move client onto shared memory if requested
+		if self.p['transport'] == 'shm':
+			self.__start_rpc_client_shm__()
+
+
+	def __start_rpc_client_shm__(self):
+
+		# Log status
+		self.log.out('[session-client] Attaching RPC client to shared memory ...')
+
+		shm_path = None
+
+		try:
+
+			# Create memory-mapped file
+			shm_path = create_shm_file(self.id, self.p['shm_size'])
+
+			# Wine sees the file via its Z: drive
+			self.rpc_client.attach_shm(
+				shm_path,
+				self.rpc_client.path_unix_to_wine(shm_path),
+				self.p['shm_size'],
+				self.p['shm_spin']
+				)
+
+		except Exception as e:
+
+			# Log status
+			self.log.out('[session-client] ... failed (%s), falling back to socket.' % str(e))
+
+		else:
+
+			# Log status
+			self.log.out('[session-client] ... attached.')
+
+		finally:
+
+			# Both sides hold their mappings, the file itself is not needed anymore
+			if shm_path is not None and os.path.exists(shm_path):
+				os.remove(shm_path)
+
 
 	def __start_rpc_server__(self):
 
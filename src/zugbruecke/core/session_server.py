@@ -185,8 +185,8 @@ class session_server_class:
 		# Log status
 		self.log.out('[session-server] ... attached.')
 
-		# Return success and dll's hash id
-		return self.dll_dict[dll_name].hash_id
+		# Return success, dll's hash id and method ids
+		return self.dll_dict[dll_name].hash_id, self.dll_dict[dll_name].method_ids
 
 
 	def __set_parameter__(self, parameter):
@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	src/zugbruecke/core/shm.py: Shared memory ring buffer transport for RPC
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2018 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import mmap
+from multiprocessing.reduction import ForkingPickler
+import os
+import pickle
+import socket
+import struct
+import tempfile
+import time
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CONSTANTS
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+# Layout of one ring (one per direction): head (u32), tail (u32), parked (u32), padding
+SHM_RING_HEAD = 0
+SHM_RING_TAIL = 4
+SHM_RING_PARKED = 8
+SHM_RING_HEADER_SIZE = 64
+
+# Special values of the length field preceding every message in a ring
+SHM_MSG_WRAP = 0xFFFFFFFF # rest of ring is unused, continue at offset 0
+SHM_MSG_OVERFLOW = 0xFFFFFFFE # message too large for ring, payload follows via socket
+
+# Counters are unsigned 32 bit and wrap around
+SHM_COUNTER_MASK = 0xFFFFFFFF
+
+# Seconds a parked reader blocks on the doorbell socket before re-checking its ring
+SHM_PARK_TIMEOUT = 0.05
+
+# Doorbell message on socket (payloads are never empty)
+SHM_DOORBELL = b''
+
+_u32 = struct.Struct('<I')
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def create_shm_file(session_id, ring_size):
+
+	# Prefer a RAM-backed location, both sides see it (Wine via Z: drive)
+	shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+	# Create file
+	fd, path = tempfile.mkstemp(prefix = 'zugbruecke_%s_' % session_id, suffix = '.shm', dir = shm_dir)
+
+	# Zero-fill for two rings (one per direction)
+	os.ftruncate(fd, get_shm_file_size(ring_size))
+	os.close(fd)
+
+	return path
+
+
+def get_shm_file_size(ring_size):
+
+	return 2 * (SHM_RING_HEADER_SIZE + ring_size)
+
+
+def set_connection_nodelay(connection):
+
+	# Doorbells are tiny - do not let Nagle's algorithm hold them back
+	try:
+		s = socket.fromfd(connection.fileno(), socket.AF_INET, socket.SOCK_STREAM)
+		s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		s.close() # closes duplicate only
+	except (OSError, AttributeError, ValueError):
+		pass # not a TCP socket or not supported on platform
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASS: Shared memory connection
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class shm_connection_class:
+	"""
+	Duplex connection with the interface of multiprocessing.connection.Connection.
+	Messages travel through two single-producer / single-consumer ring buffers in a
+	file-backed memory map, one per direction. The original socket connection is
+	kept as a doorbell for parked readers and carries messages, which do not fit into
+	a ring.
+	"""
+
+
+	def __init__(self, socket_connection, shm_path, ring_size, spin, is_server):
+
+		# Doorbell and overflow channel
+		self.socket = socket_connection
+		set_connection_nodelay(self.socket)
+
+		# Spin iterations before parking - pointless if there is only one CPU to run on
+		self.spin = spin if (os.cpu_count() or 1) > 1 else 0
+
+		# Ring size must be a power of two, so positions survive counter wrap-around
+		if ring_size & (ring_size - 1) != 0 or ring_size < 1024:
+			raise ValueError('shm ring size must be a power of two and at least 1024 bytes')
+		self.ring_size = ring_size
+
+		# Messages larger than this are sent via socket
+		self.max_message_size = ring_size // 4
+
+		# Map file
+		with open(shm_path, 'r+b') as f:
+			self.mm = mmap.mmap(f.fileno(), get_shm_file_size(ring_size))
+
+		# Client writes into ring 0 and reads from ring 1, server vice versa
+		ring_offsets = (0, SHM_RING_HEADER_SIZE + ring_size)
+		self.tx = ring_offsets[1] if is_server else ring_offsets[0]
+		self.rx = ring_offsets[0] if is_server else ring_offsets[1]
+
+		# Payloads received via socket while waiting for a doorbell
+		self.socket_stash = []
+
+
+	def close(self):
+
+		self.mm.close()
+		self.socket.close()
+
+
+	def fileno(self):
+
+		return self.socket.fileno()
+
+
+	def poll(self, timeout = 0.0):
+
+		if self.__rx_available__():
+			return True
+
+		deadline = time.time() + (timeout if timeout is not None else 1e9)
+		while True:
+			if self.__rx_available__():
+				return True
+			if time.time() >= deadline:
+				return False
+			self.__park__(min(SHM_PARK_TIMEOUT, max(deadline - time.time(), 0.0)))
+
+
+	def recv(self):
+
+		return pickle.loads(self.recv_bytes())
+
+
+	def recv_bytes(self, maxlength = None):
+
+		# Wait for data in ring
+		self.__wait_for_rx__()
+
+		while True:
+
+			tail = self.__read_u32__(self.rx + SHM_RING_TAIL)
+			pos = self.rx + SHM_RING_HEADER_SIZE + tail % self.ring_size
+			length = self.__read_u32__(pos)
+
+			# Jump to beginning of ring
+			if length == SHM_MSG_WRAP:
+				self.__write_u32__(self.rx + SHM_RING_TAIL, (tail + self.ring_size - tail % self.ring_size) & SHM_COUNTER_MASK)
+				self.__wait_for_rx__()
+				continue
+
+			# Message was too large for ring, fetch it from socket
+			if length == SHM_MSG_OVERFLOW:
+				self.__write_u32__(self.rx + SHM_RING_TAIL, (tail + 4) & SHM_COUNTER_MASK)
+				return self.__recv_from_socket__()
+
+			# Regular message
+			data = self.mm[pos + 4:pos + 4 + length]
+			self.__write_u32__(self.rx + SHM_RING_TAIL, (tail + 4 + self.__align__(length)) & SHM_COUNTER_MASK)
+			return data
+
+
+	def send(self, obj):
+
+		self.send_bytes(ForkingPickler.dumps(obj))
+
+
+	def send_bytes(self, buf, offset = 0, size = None):
+
+		data = memoryview(buf).cast('B')
+		if size is None:
+			size = len(data) - offset
+		data = data[offset:offset + size]
+
+		# Too large, send via socket and drop a note into the ring
+		if size > self.max_message_size:
+			self.socket.send_bytes(data)
+			self.__write_to_tx__(SHM_MSG_OVERFLOW, None)
+		else:
+			self.__write_to_tx__(size, data)
+
+		# Ring the doorbell if the reader is parked
+		if self.__read_u32__(self.tx + SHM_RING_PARKED):
+			self.socket.send_bytes(SHM_DOORBELL)
+
+
+	def __align__(self, length):
+
+		return (length + 3) & ~3
+
+
+	def __read_u32__(self, offset):
+
+		return _u32.unpack_from(self.mm, offset)[0]
+
+
+	def __park__(self, timeout):
+
+		# Announce that a doorbell is required, then re-check to avoid a lost wakeup
+		self.__write_u32__(self.rx + SHM_RING_PARKED, 1)
+		try:
+			if self.__rx_available__():
+				return
+			# Block on doorbell socket. A lost wakeup costs at most the timeout.
+			if self.socket.poll(timeout):
+				message = self.socket.recv_bytes()
+				if message != SHM_DOORBELL:
+					self.socket_stash.append(message)
+		finally:
+			self.__write_u32__(self.rx + SHM_RING_PARKED, 0)
+
+
+	def __recv_from_socket__(self):
+
+		if len(self.socket_stash) > 0:
+			return self.socket_stash.pop(0)
+
+		while True:
+			message = self.socket.recv_bytes()
+			if message != SHM_DOORBELL:
+				return message
+
+
+	def __rx_available__(self):
+
+		return self.__read_u32__(self.rx + SHM_RING_HEAD) != self.__read_u32__(self.rx + SHM_RING_TAIL)
+
+
+	def __write_u32__(self, offset, value):
+
+		_u32.pack_into(self.mm, offset, value)
+
+
+	def __wait_for_rx__(self):
+
+		# Spin first - cheap if the answer is about to arrive
+		for _ in range(self.spin):
+			if self.__rx_available__():
+				return
+
+		# Then block on doorbell
+		while not self.__rx_available__():
+			self.__park__(SHM_PARK_TIMEOUT)
+
+
+	def __write_to_tx__(self, length, data):
+
+		head = self.__read_u32__(self.tx + SHM_RING_HEAD)
+		pos = head % self.ring_size
+		required = 4 + (self.__align__(length) if data is not None else 0)
+
+		# Not enough contiguous space left at the end of the ring, wrap around
+		if self.ring_size - pos < required:
+			self.__wait_for_tx_space__(head, self.ring_size - pos)
+			self.__write_u32__(self.tx + SHM_RING_HEADER_SIZE + pos, SHM_MSG_WRAP)
+			head = (head + self.ring_size - pos) & SHM_COUNTER_MASK
+			self.__write_u32__(self.tx + SHM_RING_HEAD, head)
+			pos = 0
+
+		self.__wait_for_tx_space__(head, required)
+
+		# Write message, then publish it by moving the head
+		offset = self.tx + SHM_RING_HEADER_SIZE + pos
+		self.__write_u32__(offset, length)
+		if data is not None:
+			self.mm[offset + 4:offset + 4 + length] = data
+		self.__write_u32__(self.tx + SHM_RING_HEAD, (head + required) & SHM_COUNTER_MASK)
+
+
+	def __wait_for_tx_space__(self, head, required):
+
+		# Readers are usually fast, so this is rare
+		while self.ring_size - ((head - self.__read_u32__(self.tx + SHM_RING_TAIL)) & SHM_COUNTER_MASK) < required:
+			time.sleep(0)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_call_async.py: Asynchronous calls returning futures
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2018 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	import ctypes
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class sample_class:
+
+
+	def __init__(self):
+
+		self.__dll__ = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+		self.gcd = self.__dll__.cookbook_gcd
+		self.gcd.argtypes = (ctypes.c_int, ctypes.c_int)
+		self.gcd.restype = ctypes.c_int
+
+		self.avg = self.__dll__.cookbook_avg
+		self.avg.memsync = [{'p': [0], 'l': [1], 't': 'c_double'}]
+		self.avg.argtypes = (ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+		self.avg.restype = ctypes.c_double
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.mark.skipif(platform.startswith('win'), reason = 'zugbruecke feature only')
+def test_call_async_many_in_flight():
+
+	sample = sample_class()
+
+	futures = [sample.gcd.call_async(35 * n, 42 * n) for n in range(1, 51)]
+
+	# Synchronous calls in between are fine
+	assert 7 == sample.gcd(35, 42)
+
+	assert [7 * n for n in range(1, 51)] == [future.result() for future in futures]
+
+
+@pytest.mark.skipif(platform.startswith('win'), reason = 'zugbruecke feature only')
+def test_call_async_memsync():
+
+	sample = sample_class()
+
+	values = [1.0, 2.0, 3.0, 4.0]
+	values_c = (ctypes.c_double * len(values))(*values)
+
+	future = sample.avg.call_async(ctypes.cast(values_c, ctypes.POINTER(ctypes.c_double)), len(values))
+
+	assert pytest.approx(2.5, 0.0000001) == future.result()
+
+
+@pytest.mark.skipif(platform.startswith('win'), reason = 'zugbruecke feature only')
+def test_call_async_error():
+
+	sample = sample_class()
+
+	future = sample.gcd.call_async(7)
+
+	with pytest.raises(TypeError):
+		future.result()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_transport_shm.py: Tests shared memory RPC transport
+
+	Required to run on platform / side: [UNIX]
+
+	Copyright (C) 2017-2018 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	import ctypes
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+@pytest.mark.skipif(platform.startswith('win'), reason = 'zugbruecke transport only')
+def test_transport_shm():
+
+	session = ctypes.session({'transport': 'shm', 'shm_size': 4096})
+
+	dll = session.load_library('tests/demo_dll.dll', 'windll')
+
+	gcd = dll.cookbook_gcd
+	gcd.argtypes = (ctypes.c_int, ctypes.c_int)
+	gcd.restype = ctypes.c_int
+
+	avg = dll.cookbook_avg
+	avg.memsync = [{'p': [0], 'l': [1], 't': 'c_double'}]
+	avg.argtypes = (ctypes.POINTER(ctypes.c_double), ctypes.c_int)
+	avg.restype = ctypes.c_double
+
+	values = list(range(1, 2001)) # exceeds ring buffer, travels via socket
+	values_c = (ctypes.c_double * len(values))(*values)
+
+	try:
+		for _ in range(100):
+			assert 7 == gcd(35, 42)
+		assert pytest.approx(1000.5, 0.0000001) == avg(ctypes.cast(values_c, ctypes.POINTER(ctypes.c_double)), len(values))
+		assert 7 == gcd(35, 42)
+	finally:
+		session.terminate()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""
+
+ZUGBRUECKE
+Calling routines in Windows DLLs from Python scripts running on unixlike systems
+https://github.com/pleiszenburg/zugbruecke
+
+	tests/test_wire_format.py: Compact binary call messages and their fallback
+
+	Required to run on platform / side: [UNIX, WINE]
+
+	Copyright (C) 2017-2018 Sebastian M. Ernst <ernst@pleiszenburg.de>
+
+<LICENSE_BLOCK>
+The contents of this file are subject to the GNU Lesser General Public License
+Version 2.1 ("LGPL" or "License"). You may not use this file except in
+compliance with the License. You may obtain a copy of the License at
+https://www.gnu.org/licenses/old-licenses/lgpl-2.1.txt
+https://github.com/pleiszenburg/zugbruecke/blob/master/LICENSE
+
+Software distributed under the License is distributed on an "AS IS" basis,
+WITHOUT WARRANTY OF ANY KIND, either express or implied. See the License for the
+specific language governing rights and limitations under the License.
+</LICENSE_BLOCK>
+
+"""
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# IMPORT
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+import pytest
+
+from sys import platform
+if any([platform.startswith(os_name) for os_name in ['linux', 'darwin', 'freebsd']]):
+	import zugbruecke as ctypes
+elif platform.startswith('win'):
+	import ctypes
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# CLASSES AND ROUTINES
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+class sample_class:
+
+
+	def __init__(self):
+
+		self.__dll__ = ctypes.windll.LoadLibrary('tests/demo_dll.dll')
+
+		self.sqrt_int = self.__dll__.sqrt_int
+		self.sqrt_int.argtypes = (ctypes.c_int16,)
+		self.sqrt_int.restype = ctypes.c_int16
+
+		self.simple_demo_routine = self.__dll__.simple_demo_routine
+		self.simple_demo_routine.argtypes = (ctypes.c_float, ctypes.c_float)
+		self.simple_demo_routine.restype = ctypes.c_float
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+# TEST(s)
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+
+def test_wire_format_ctypes_values():
+
+	sample = sample_class()
+
+	assert 3 == sample.sqrt_int(ctypes.c_int16(9))
+	assert pytest.approx(1.3084125518798828, 0.0000001) == sample.simple_demo_routine(ctypes.c_float(20.0), 1.07)
+
+
+def test_wire_format_fallback_out_of_range():
+
+	sample = sample_class()
+
+	# Does not fit into an int16 message - travels generic path, truncated like ctypes does
+	assert 3 == sample.sqrt_int(2 ** 16 + 9)
+